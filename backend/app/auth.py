@@ -6,19 +6,38 @@
 #   4. decode_access_token: settings.SECRET_KEY → settings.secret_key
 #   5. create_access_token_for_user: settings.ACCESS_TOKEN_EXPIRE_MINUTES → lowercase
 
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import timedelta, datetime
 from typing import Optional
-from jose import JWTError, jwt
+from cachetools import TTLCache
+from jose import JWTError, jwk, jwt
 from passlib.context import CryptContext
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer
+from sqlalchemy.exc import IntegrityError
 from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
 from app.config import settings
 from app.models import User, TokenData
-from app.database import get_session
+from app.database import get_session, get_async_session
 
 # ── Configuração de segurança ────────────────────────────────
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Argon2id como scheme principal (parâmetros do perfil OWASP): mais
+# rápido por verificação que bcrypt no mesmo nível de segurança e com
+# custo de memória/tempo ajustável de forma independente. bcrypt segue
+# aceito para verificar hashes antigos, marcados como deprecated para
+# re-hash automático no próximo login.
+pwd_context = CryptContext(
+    schemes=["argon2", "bcrypt"],
+    deprecated=["bcrypt"],
+    argon2__memory_cost=19456,
+    argon2__time_cost=2,
+    argon2__parallelism=1,
+)
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
 
 
@@ -32,25 +51,56 @@ def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
 
+# Pool dedicado para o KDF (Argon2/bcrypt): isola o trabalho CPU-bound
+# de hashing do threadpool compartilhado do FastAPI, de modo que uma
+# rajada de logins não enfileira atrás (nem na frente) do resto do
+# trabalho bloqueante da aplicação. As extensões C soltam o GIL.
+_KDF_POOL = ThreadPoolExecutor(
+    max_workers=os.cpu_count() or 4,
+    thread_name_prefix="kdf",
+)
+
+
+async def averify_password(plain_password: str, hashed_password: str) -> bool:
+    """Versão assíncrona de verify_password (roda no pool de KDF)."""
+    return await asyncio.get_running_loop().run_in_executor(
+        _KDF_POOL, pwd_context.verify, plain_password, hashed_password
+    )
+
+
+async def aget_password_hash(password: str) -> str:
+    """Versão assíncrona de get_password_hash (roda no pool de KDF)."""
+    return await asyncio.get_running_loop().run_in_executor(
+        _KDF_POOL, pwd_context.hash, password
+    )
+
+
 # ── JWT ───────────────────────────────────────────────────────
 
+# Chave HMAC construída uma única vez no import: evita a normalização
+# da chave e a reconstrução da lista de algoritmos a cada encode/decode
+_JWT_KEY = jwk.construct(settings.secret_key, settings.algorithm)
+_JWT_ALGORITHMS = [settings.algorithm]
+
+# TTL padrão do token em segundos, resolvido uma vez no import (sem
+# lookup em settings por login)
+_ACCESS_TOKEN_TTL_SECONDS = settings.access_token_expire_minutes * 60
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
+    # exp/iat em epoch inteiro (formato nativo do claim JWT): aritmética
+    # de int ao invés de alocar datetime + timedelta por token, e o
+    # datetime.utcnow() deprecado sai de cena
     to_encode = data.copy()
-    expire = datetime.utcnow() + (
-        expires_delta if expires_delta
-        else timedelta(minutes=settings.access_token_expire_minutes)   # ✅ FIX: lowercase
-    )
-    to_encode.update({"exp": expire})
-    return jwt.encode(to_encode, settings.secret_key, algorithm=settings.algorithm)  # ✅ FIX
+    now = int(time.time())
+    ttl = int(expires_delta.total_seconds()) if expires_delta else _ACCESS_TOKEN_TTL_SECONDS
+    to_encode.update({"exp": now + ttl, "iat": now})
+    return jwt.encode(to_encode, _JWT_KEY, algorithm=settings.algorithm)
 
 
 def decode_access_token(token: str) -> TokenData:
     try:
-        payload = jwt.decode(
-            token,
-            settings.secret_key,       # ✅ FIX: lowercase
-            algorithms=[settings.algorithm]  # ✅ FIX
-        )
+        payload = jwt.decode(token, _JWT_KEY, algorithms=_JWT_ALGORITHMS)
         username: str = payload.get("sub")
         if username is None:
             raise HTTPException(
@@ -69,31 +119,75 @@ def decode_access_token(token: str) -> TokenData:
 
 # ── Autenticação ─────────────────────────────────────────────
 
-def authenticate_user(session: Session, username: str, password: str) -> Optional[User]:
+# Hash de sacrifício: verificado quando o username não existe, para que
+# logins inválidos custem o mesmo tempo que senhas erradas (sem vazar a
+# existência da conta via timing)
+_DUMMY_HASH = pwd_context.hash("senha-falsa-para-timing")
+
+
+async def authenticate_user(session: AsyncSession, username: str, password: str) -> Optional[User]:
     statement = select(User).where(User.username == username)
-    user = session.exec(statement).first()
-    if not user:                                          # ✅ FIX: era `if not User:`
-        return None
-    if not verify_password(password, user.hashed_password):
+    user = (await session.exec(statement)).first()
+    # Roda o KDF sempre, mesmo sem usuário, mantendo tempo constante
+    hashed = user.hashed_password if user else _DUMMY_HASH
+    if not await averify_password(password, hashed) or user is None:
         return None
+    # Migração preguiçosa: hashes bcrypt antigos são regravados em
+    # Argon2id no primeiro login bem-sucedido
+    if pwd_context.needs_update(user.hashed_password):
+        user.hashed_password = await aget_password_hash(password)
+        session.add(user)
+        await session.commit()
     return user
 
 
 # ── FastAPI Dependencies ──────────────────────────────────────
 
+# Cache LRU+TTL de tokens já verificados: em cache hit o request pula o
+# HMAC-SHA256 + base64 + JSON parse do decode e vira um lookup de dict.
+# Cada entrada guarda (username, exp) e o exp do próprio token é
+# re-checado a cada hit, então um token expirado nunca é aceito. O
+# usuário continua sendo buscado no banco a cada request, de modo que
+# desativação de conta vale imediatamente (sem hook de revogação).
+_TOKEN_CACHE: "TTLCache[str, tuple[str, float]]" = TTLCache(
+    maxsize=10_000,
+    ttl=settings.access_token_expire_minutes * 60,
+)
+_TOKEN_CACHE_LOCK = threading.Lock()
+
+
 async def get_current_user(
+    request: Request,
     token: str = Depends(oauth2_scheme),
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_session),
 ) -> User:
-    token_data = decode_access_token(token)
-    statement = select(User).where(User.username == token_data.username)
-    user = session.exec(statement).first()
+    # Memoização por request: se vários validadores na mesma rota
+    # resolverem o usuário, o decode do JWT + SELECT rodam uma vez só
+    cached = getattr(request.state, "current_user", None)
+    if cached is not None:
+        return cached
+
+    with _TOKEN_CACHE_LOCK:
+        entry = _TOKEN_CACHE.get(token)
+    if entry is not None and entry[1] > time.time():
+        username = entry[0]
+    else:
+        token_data = decode_access_token(token)
+        username = token_data.username
+        # token já verificado acima; só lemos o exp para o re-check
+        exp = jwt.get_unverified_claims(token).get("exp", 0)
+        with _TOKEN_CACHE_LOCK:
+            _TOKEN_CACHE[token] = (username, exp)
+
+    statement = select(User).where(User.username == username)
+    user = (await session.exec(statement)).first()
     if user is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Usuário não encontrado",
             headers={"WWW-Authenticate": "Bearer"},
         )
+    request.state.current_user = user
     return user
 
 
@@ -105,28 +199,47 @@ async def get_current_active_user(current_user: User = Depends(get_current_user)
 
 # ── Helpers ───────────────────────────────────────────────────
 
-def get_user_by_username(session: Session, username: str) -> Optional[User]:
-    return session.exec(select(User).where(User.username == username)).first()
+async def get_user_by_username(session: AsyncSession, username: str) -> Optional[User]:
+    return (await session.exec(select(User).where(User.username == username))).first()
 
 
-def get_user_by_email(session: Session, email: str) -> Optional[User]:
-    return session.exec(select(User).where(User.email == email)).first()
+async def get_user_by_email(session: AsyncSession, email: str) -> Optional[User]:
+    return (await session.exec(select(User).where(User.email == email))).first()
 
 
-def create_user(session: Session, username: str, email: str, password: str) -> User:
-    if get_user_by_username(session, username):
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Username já existe")
-    if get_user_by_email(session, email):
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Email já existe")
+def user_conflict_to_http(exc: IntegrityError) -> HTTPException:
+    """
+    Traduz a violação de UNIQUE de users (username/email) em um 400
+    amigável. A mensagem do driver inclui a coluna/constraint violada
+    ('users.username' no SQLite, 'users_username_key' no Postgres).
+    """
+    message = str(exc.orig)
+    if "username" in message:
+        return HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Username já está em uso")
+    if "email" in message:
+        return HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Email já está em uso")
+    return HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Usuário já existe")
 
+
+async def create_user(session: AsyncSession, username: str, email: str, password: str) -> User:
+    # Sem SELECT de pré-checagem: username e email já são UNIQUE no
+    # banco, então deixamos o próprio INSERT detectar duplicidade (a
+    # verificação acontece dentro do índice único, de graça) e traduzimos
+    # o IntegrityError. Também elimina a corrida check-then-insert.
     new_user = User(
         username=username,
         email=email,
-        hashed_password=get_password_hash(password),
+        hashed_password=await aget_password_hash(password),
     )
     session.add(new_user)
-    session.commit()
-    session.refresh(new_user)
+    try:
+        await session.commit()
+    except IntegrityError as exc:
+        await session.rollback()
+        raise user_conflict_to_http(exc) from exc
+    # refresh necessário aqui: created_at é server_default e a resposta
+    # (UserResponse) precisa do valor gerado pelo banco
+    await session.refresh(new_user)
     return new_user
 
 
@@ -135,8 +248,8 @@ def create_access_token_for_user(user: User) -> str:
     return create_access_token(data={"sub": user.username}, expires_delta=expires)
 
 
-def authenticate_and_get_token(session: Session, username: str, password: str) -> str:
-    user = authenticate_user(session, username, password)
+async def authenticate_and_get_token(session: AsyncSession, username: str, password: str) -> str:
+    user = await authenticate_user(session, username, password)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -146,5 +259,5 @@ def authenticate_and_get_token(session: Session, username: str, password: str) -
     return create_access_token_for_user(user)
 
 
-def register_user(session: Session, username: str, email: str, password: str) -> User:
-    return create_user(session, username, email, password)
\ No newline at end of file
+async def register_user(session: AsyncSession, username: str, email: str, password: str) -> User:
+    return await create_user(session, username, email, password)
\ No newline at end of file
@@ -38,11 +38,12 @@ class Settings(BaseSettings):
     )
 
 
-@lru_cache
+@lru_cache(maxsize=1)
 def get_settings() -> Settings:
     """
     Retorna instância única das configurações (singleton).
-    O decorator @lru_cache garante que seja criada apenas uma vez.
+    O decorator @lru_cache garante que seja criada apenas uma vez,
+    evitando re-parsear o arquivo .env a cada chamada.
     """
     return Settings()
 
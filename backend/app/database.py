@@ -1,58 +1,180 @@
 # app/database.py
 
 from sqlmodel import SQLModel, create_engine, Session
-from sqlalchemy.pool import StaticPool
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlmodel.ext.asyncio.session import AsyncSession
 from app.config import settings
 
 
+def _async_database_url() -> str:
+    """
+    Converte a URL configurada para o driver assíncrono equivalente.
+    sqlite:// -> sqlite+aiosqlite:// | postgresql:// -> postgresql+asyncpg://
+    """
+    url = settings.database_url
+    if url.startswith("sqlite://"):
+        return url.replace("sqlite://", "sqlite+aiosqlite://", 1)
+    if url.startswith("postgresql://"):
+        return url.replace("postgresql://", "postgresql+asyncpg://", 1)
+    return url
+
+
 # Configuração do engine
+# query_cache_size amplia o cache de statements compilados do SQLAlchemy
+# (padrão 500): o app emite poucos statements distintos, mas dependências
+# e filtros geram variações suficientes para evicções no cache padrão.
 def get_engine():
     """
     Cria e retorna o engine do banco de dados.
-    SQLite: usa StaticPool e check_same_thread=False
+    SQLite: usa QueuePool com check_same_thread=False
     PostgreSQL: configuração padrão otimizada
     """
-    connect_args = {}
-    poolclass = None
-    
     if settings.database_url.startswith("sqlite"):
         # SQLite específico
-        connect_args = {"check_same_thread": False}
-        poolclass = StaticPool
+        # QueuePool (ao invés de StaticPool) permite várias conexões
+        # simultâneas: requisições concorrentes não ficam serializadas
+        # em uma única conexão e o page cache do SQLite permanece quente
+        # entre requisições.
         return create_engine(
             settings.database_url,
             echo=settings.debug,
-            connect_args=connect_args,
-            poolclass=poolclass
+            connect_args={"check_same_thread": False},
+            pool_size=8,
+            max_overflow=16,
+            pool_pre_ping=True,
+            pool_recycle=1800,
+            query_cache_size=1200
         )
     else:
         # PostgreSQL ou outros
+        # pool_use_lifo prefere a conexão usada mais recentemente, então
+        # conexões de overflow ociosas podem ser recicladas e os caches
+        # por-backend do servidor ficam mais quentes.
         return create_engine(
             settings.database_url,
             echo=settings.debug,
             pool_pre_ping=True,
-            pool_size=5,
-            max_overflow=10
+            pool_size=20,
+            max_overflow=20,
+            pool_timeout=30,
+            pool_use_lifo=True,
+            pool_recycle=1800,
+            query_cache_size=1200
         )
 
 
-# Instância global do engine
+def get_async_engine():
+    """
+    Cria e retorna o engine assíncrono (aiosqlite/asyncpg).
+
+    Com sessões assíncronas o FastAPI não precisa despachar cada acesso
+    ao banco para o threadpool: o event loop intercala o I/O de muitas
+    requisições concorrentes ao invés de ocupar threads escassas.
+    """
+    if settings.database_url.startswith("sqlite"):
+        return create_async_engine(
+            _async_database_url(),
+            echo=settings.debug,
+            pool_size=8,
+            max_overflow=16,
+            pool_pre_ping=True,
+            pool_recycle=1800,
+            query_cache_size=1200
+        )
+    else:
+        return create_async_engine(
+            _async_database_url(),
+            echo=settings.debug,
+            pool_pre_ping=True,
+            pool_size=20,
+            max_overflow=20,
+            pool_timeout=30,
+            pool_use_lifo=True,
+            pool_recycle=1800,
+            query_cache_size=1200,
+            # asyncpg: cacheia os PREPAREs do lado do servidor também
+            connect_args={"statement_cache_size": 1024}
+        )
+
+
+# Instâncias globais dos engines
 engine = get_engine()
+async_engine = get_async_engine()
+
+# expire_on_commit=False: os objetos continuam utilizáveis após o commit
+# sem disparar um SELECT de refresh implícito
+async_session_factory = async_sessionmaker(
+    async_engine,
+    class_=AsyncSession,
+    expire_on_commit=False
+)
+
+
+if settings.database_url.startswith("sqlite"):
+
+    @event.listens_for(engine, "connect")
+    @event.listens_for(async_engine.sync_engine, "connect")
+    def _set_sqlite_pragmas(dbapi_conn, connection_record):
+        """
+        Ajusta PRAGMAs de performance em cada conexão SQLite nova:
+        - WAL: escritores não bloqueiam leitores
+        - synchronous=NORMAL: fsync só em checkpoints (seguro com WAL)
+        - temp_store/mmap/cache: leituras repetidas servidas da memória
+        """
+        cursor = dbapi_conn.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+        cursor.execute("PRAGMA mmap_size=268435456")
+        cursor.execute("PRAGMA cache_size=-64000")
+        cursor.close()
+
+
+# Índices trigram (apenas PostgreSQL): ILIKE '%termo%' com curinga à
+# esquerda não usa B-tree e vira seq scan conforme products cresce; com
+# GIN + pg_trgm o planner resolve cada predicado do OR da busca via
+# Bitmap Index Scan. No SQLite a busca segue pelos índices existentes.
+_PG_TRGM_DDL = (
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    # Índices de expressão em lower(col): a busca usa lower(col) LIKE
+    # :termo (termo já minúsculo), então é a expressão minúscula que
+    # precisa estar indexada para o planner usar o GIN
+    "CREATE INDEX IF NOT EXISTS idx_products_nome_trgm "
+    "ON products USING gin (lower(nome) gin_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS idx_products_descricao_trgm "
+    "ON products USING gin (lower(descricao) gin_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS idx_products_franquia_trgm "
+    "ON products USING gin (lower(franquia) gin_trgm_ops)",
+    # Coluna tsvector gerada (custo de manutenção zero) + GIN: a busca
+    # por tokens vira um único probe de índice ao invés do BitmapOr de
+    # três scans trigram do caminho ILIKE
+    "ALTER TABLE products ADD COLUMN IF NOT EXISTS search_tsv tsvector "
+    "GENERATED ALWAYS AS (to_tsvector('simple', "
+    "coalesce(nome,'') || ' ' || coalesce(descricao,'') || ' ' || coalesce(franquia,''))) STORED",
+    "CREATE INDEX IF NOT EXISTS idx_products_search_tsv "
+    "ON products USING gin (search_tsv)",
+)
 
 
 def create_db_and_tables():
     """
     Cria todas as tabelas no banco de dados.
     Deve ser chamado na inicialização da aplicação (main.py).
-    
+
     IMPORTANTE: Os models devem ser importados ANTES de chamar esta função
     para que SQLModel.metadata tenha conhecimento deles.
     """
     # Importa todos os models aqui para garantir que sejam registrados
     from app.models import User, Category, Product  # ✅ CORREÇÃO
-    
+
     SQLModel.metadata.create_all(engine)
 
+    if engine.dialect.name == "postgresql":
+        with engine.begin() as conn:
+            for ddl in _PG_TRGM_DDL:
+                conn.exec_driver_sql(ddl)
+
 
 def get_session():
     """
@@ -63,6 +185,15 @@ def get_session():
         yield session
 
 
+async def get_async_session():
+    """
+    Dependency que fornece uma sessão assíncrona do banco de dados.
+    Usado como dependência do FastAPI: Depends(get_async_session)
+    """
+    async with async_session_factory() as session:
+        yield session
+
+
 # Função auxiliar para transações manuais (opcional)
 def get_session_context():
     """
@@ -1,9 +1,15 @@
 # app/dependencies.py
 
+import re
+import unicodedata
+from functools import lru_cache
 from typing import Optional
 from fastapi import Depends, HTTPException, status, Query, Path
-from sqlmodel import Session, select
-from app.database import get_session
+from sqlalchemy import lambda_stmt
+from sqlalchemy.orm import selectinload
+from sqlmodel import Session, select, or_
+from sqlmodel.ext.asyncio.session import AsyncSession
+from app.database import get_session, get_async_session
 from app.auth import get_current_active_user
 from app.models import User, Category, Product
 
@@ -76,16 +82,17 @@ class ProductFilterParams:
 # ENTITY GETTERS (com validação) - CORRIGIDO
 # ============================================================================
 
-def get_category_or_404(
+async def get_category_or_404(
     category_id: int = Path(..., description="ID da categoria"),  # ✅ CORREÇÃO
-    session: Session = Depends(get_session)
+    session: AsyncSession = Depends(get_async_session)
 ) -> Category:
     """
     Busca uma categoria por ID ou retorna 404.
     """
-    statement = select(Category).where(Category.id == category_id)
-    category = session.exec(statement).first()
-    
+    # session.get consulta o identity map antes de ir ao banco:
+    # lookups repetidos do mesmo ID na mesma request não emitem SQL
+    category = await session.get(Category, category_id)
+
     if not category:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -95,16 +102,19 @@ def get_category_or_404(
     return category
 
 
-def get_product_or_404(
+async def get_product_or_404(
     product_id: int = Path(..., description="ID do produto"),  # ✅ CORREÇÃO
-    session: Session = Depends(get_session)
+    session: AsyncSession = Depends(get_async_session)
 ) -> Product:
     """
     Busca um produto por ID ou retorna 404.
     """
-    statement = select(Product).where(Product.id == product_id)
-    product = session.exec(statement).first()
-    
+    # Carrega a categoria junto: lazy-load não funciona em sessão
+    # assíncrona e a resposta serializa product.category
+    product = await session.get(
+        Product, product_id, options=[selectinload(Product.category)]
+    )
+
     if not product:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -114,16 +124,15 @@ def get_product_or_404(
     return product
 
 
-def get_user_or_404(
+async def get_user_or_404(
     user_id: int = Path(..., description="ID do usuário"),  # ✅ CORREÇÃO
-    session: Session = Depends(get_session)
+    session: AsyncSession = Depends(get_async_session)
 ) -> User:
     """
     Busca um usuário por ID ou retorna 404.
     """
-    statement = select(User).where(User.id == user_id)
-    user = session.exec(statement).first()
-    
+    user = await session.get(User, user_id)
+
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -133,6 +142,31 @@ def get_user_or_404(
     return user
 
 
+async def get_many_or_404(model, ids: list[int], session: AsyncSession) -> list:
+    """
+    Busca vários registros de uma vez via `WHERE id IN (...)`.
+
+    Evita o clássico N+1 de chamar get_*_or_404 em loop: uma única
+    round-trip ao banco ao invés de uma por ID.
+
+    Raises:
+        HTTPException 404: se algum dos IDs não existir
+    """
+    if not ids:
+        return []
+
+    rows = (await session.exec(select(model).where(model.id.in_(ids)))).all()
+
+    missing = set(ids) - {row.id for row in rows}
+    if missing:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"{model.__name__} com ID(s) {sorted(missing)} não encontrado(s)"
+        )
+
+    return rows
+
+
 # ============================================================================
 # VALIDATION HELPERS
 # ============================================================================
@@ -144,91 +178,151 @@ def validate_category_exists(
     """
     Valida se uma categoria existe (para uso em outros endpoints).
     """
-    statement = select(Category).where(Category.id == category_id)
-    category = session.exec(statement).first()
-    
-    if not category:
+    # lambda_stmt memoiza a construção/compilação do statement entre
+    # chamadas — só o bind param (category_id) muda por request.
+    # SELECT EXISTS(...) devolve um booleano direto do probe de índice,
+    # sem hidratar colunas da categoria nem relacionamentos.
+    statement = lambda_stmt(
+        lambda: select(select(1).where(Category.id == category_id).exists())
+    )
+    exists = session.scalar(statement)
+
+    if not exists:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"Categoria com ID {category_id} não existe"
         )
 
 
-def validate_unique_category_name(
-    name: str,
-    session: Session,
-    exclude_id: Optional[int] = None
+async def validate_category_exists_async(
+    category_id: int,
+    session: AsyncSession
 ) -> None:
     """
-    Valida se o nome da categoria é único.
+    Versão assíncrona de validate_category_exists, para os endpoints já
+    migrados para AsyncSession.
     """
-    statement = select(Category).where(Category.name == name)
-    
-    if exclude_id:
-        statement = statement.where(Category.id != exclude_id)
-    
-    existing = session.exec(statement).first()
-    
-    if existing:
+    statement = lambda_stmt(
+        lambda: select(select(1).where(Category.id == category_id).exists())
+    )
+    exists = await session.scalar(statement)
+
+    if not exists:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Já existe uma categoria com o nome '{name}'"
+            detail=f"Categoria com ID {category_id} não existe"
         )
 
 
-def validate_unique_category_slug(
-    slug: str,
-    session: Session,
+async def validate_unique_category(
+    session: AsyncSession,
+    name: Optional[str] = None,
+    slug: Optional[str] = None,
     exclude_id: Optional[int] = None
 ) -> None:
     """
-    Valida se o slug da categoria é único.
+    Valida nome e/ou slug de categoria em uma única query.
+
+    Nome e slug são quase sempre validados juntos (create/update), então
+    uma query com OR corta as round-trips ao banco pela metade.
     """
-    statement = select(Category).where(Category.slug == slug)
-    
+    conditions = []
+    if name is not None:
+        conditions.append(Category.name == name)
+    if slug is not None:
+        conditions.append(Category.slug == slug)
+
+    if not conditions:
+        return
+
+    statement = select(Category.name, Category.slug).where(or_(*conditions))
+
     if exclude_id:
         statement = statement.where(Category.id != exclude_id)
-    
-    existing = session.exec(statement).first()
-    
-    if existing:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Já existe uma categoria com o slug '{slug}'"
-        )
+
+    for existing_name, existing_slug in (await session.exec(statement)).all():
+        if name is not None and existing_name == name:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Já existe uma categoria com o nome '{name}'"
+            )
+        if slug is not None and existing_slug == slug:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Já existe uma categoria com o slug '{slug}'"
+            )
+
+
+async def validate_unique_category_name(
+    name: str,
+    session: AsyncSession,
+    exclude_id: Optional[int] = None
+) -> None:
+    """
+    Valida se o nome da categoria é único.
+    (Wrapper de compatibilidade — prefira validate_unique_category.)
+    """
+    await validate_unique_category(session, name=name, exclude_id=exclude_id)
+
+
+async def validate_unique_category_slug(
+    slug: str,
+    session: AsyncSession,
+    exclude_id: Optional[int] = None
+) -> None:
+    """
+    Valida se o slug da categoria é único.
+    (Wrapper de compatibilidade — prefira validate_unique_category.)
+    """
+    await validate_unique_category(session, slug=slug, exclude_id=exclude_id)
 
 
 # ============================================================================
 # UTILITY FUNCTIONS
 # ============================================================================
 
+# Regex do generate_slug pré-compilada uma única vez no import, evitando
+# o lookup (com lock) no cache interno do módulo re a cada chamada.
+# [^a-z0-9]+ já colapsa sequências inteiras em um único hífen.
+_SLUG_NONALNUM = re.compile(r'[^a-z0-9]+')
+
+# Tabela de tradução para os acentos do português: um único passe C de
+# str.translate ao invés de normalize NFKD + encode/decode por chamada
+_SLUG_STRIP_ACCENTS = str.maketrans(
+    "áàâãäéèêëíìîïóòôõöúùûüçñÁÀÂÃÄÉÈÊËÍÌÎÏÓÒÔÕÖÚÙÛÜÇÑ",
+    "aaaaaeeeeiiiiooooouuuucnAAAAAEEEEIIIIOOOOOUUUUCN",
+)
+
+
+@lru_cache(maxsize=1024)
 def generate_slug(text: str) -> str:
     """
     Gera um slug URL-friendly a partir de um texto.
+
+    Memoizado: nomes de categoria se repetem (retries, updates sem
+    mudança de nome), então chamadas repetidas viram um lookup de dict.
     """
-    import unicodedata
-    import re
-    
-    # Remove acentos
-    text = unicodedata.normalize('NFKD', text)
-    text = text.encode('ascii', 'ignore').decode('ascii')
-    
-    # Lowercase e substitui espaços por hífens
-    text = text.lower()
-    text = re.sub(r'[^a-z0-9]+', '-', text)
-    
-    # Remove hífens duplicados e nas pontas
-    text = re.sub(r'-+', '-', text)
-    text = text.strip('-')
-    
-    return text
+    # Remove acentos: translate cobre o alfabeto pt-BR; o fallback NFKD
+    # só roda se sobrar algum caractere fora do ASCII
+    text = text.translate(_SLUG_STRIP_ACCENTS)
+    if not text.isascii():
+        text = unicodedata.normalize('NFKD', text)
+        text = text.encode('ascii', 'ignore').decode('ascii')
+
+    # Lowercase, troca tudo que não é [a-z0-9] por hífen e apara as pontas
+    text = _SLUG_NONALNUM.sub('-', text.lower())
+    return text.strip('-')
+
+
+# Troca separadores en-US -> pt-BR em um único passe (vírgula <-> ponto)
+_PRICE_SEPARATORS = str.maketrans({',': '.', '.': ','})
 
 
 def format_price(price: float) -> str:
     """
     Formata um preço para exibição em Real brasileiro.
     """
-    return f"R$ {price:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
+    return f"R$ {price:,.2f}".translate(_PRICE_SEPARATORS)
 
 
 # ============================================================================
@@ -238,10 +332,13 @@ def format_price(price: float) -> str:
 def paginated_response(items: list, total: int, skip: int, limit: int) -> dict:
     """
     Cria uma resposta paginada padronizada.
+
+    PaginationParams garante limit >= 1, então não há guarda de divisão
+    por zero aqui.
     """
-    page = (skip // limit) + 1 if limit > 0 else 1
-    pages = (total + limit - 1) // limit if limit > 0 else 1
-    
+    page = skip // limit + 1
+    pages = -(-total // limit)  # ceil-div sem float
+
     return {
         "items": items,
         "total": total,
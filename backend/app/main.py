@@ -1,9 +1,10 @@
-from fastapi import FastAPI, Request, status
+from fastapi import FastAPI, HTTPException, Request, Response, status
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, ORJSONResponse
 from fastapi.exceptions import RequestValidationError
 from sqlmodel import SQLModel
 from contextlib import asynccontextmanager
+import json
 import time
 
 from app.config import settings
@@ -68,6 +69,9 @@ app = FastAPI(
     docs_url="/docs",
     redoc_url="/redoc",
     openapi_url="/openapi.json",
+    # orjson serializa em C (vários x mais rápido que o json da stdlib
+    # usado pelo JSONResponse padrão) — vale para todas as rotas
+    default_response_class=ORJSONResponse,
     lifespan=lifespan,
     debug=settings.debug,
      # Metadata adicional
@@ -118,6 +122,45 @@ async def add_process_time_header(request: Request, call_next):
     return response
 
 # Exception Handlers
+
+# Corpos de erro pré-serializados: os details dos HTTPException são
+# quase todos strings constantes ("Username já está em uso", etc.) e o
+# caminho de falha é batido com força por tráfego de brute-force no
+# login. Em hit, o handler devolve os bytes prontos sem jsonable_encoder
+# nem json.dumps. Cap de tamanho protege contra details dinâmicos
+# (f-strings com nomes de categoria) incharem o dict.
+_HTTP_ERROR_BODIES: dict = {}
+_HTTP_ERROR_BODIES_MAX = 256
+
+
+@app.exception_handler(HTTPException)
+async def http_exception_handler(request: Request, exc: HTTPException):
+    """
+    Handler de HTTPException que cacheia o corpo JSON serializado por
+    (status_code, detail) quando o detail é uma string constante.
+    """
+    if exc.status_code in (204, 304):
+        return Response(status_code=exc.status_code, headers=exc.headers)
+
+    if isinstance(exc.detail, str):
+        key = (exc.status_code, exc.detail)
+        body = _HTTP_ERROR_BODIES.get(key)
+        if body is None:
+            body = json.dumps({"detail": exc.detail}, ensure_ascii=False).encode()
+            if len(_HTTP_ERROR_BODIES) < _HTTP_ERROR_BODIES_MAX:
+                _HTTP_ERROR_BODIES[key] = body
+        return Response(
+            content=body,
+            status_code=exc.status_code,
+            media_type="application/json",
+            headers=exc.headers,
+        )
+
+    return JSONResponse(
+        {"detail": exc.detail}, status_code=exc.status_code, headers=exc.headers
+    )
+
+
 @app.exception_handler(RequestValidationError)
 async def validation_exception_handler(request: Request, exc: RequestValidationError):
     """
@@ -1,6 +1,7 @@
 # app/models.py
 
 from sqlmodel import SQLModel, Field, Relationship
+from sqlalchemy import Column, DateTime, Index, func, text
 from datetime import datetime
 from typing import Optional
 from decimal import Decimal
@@ -22,8 +23,13 @@ class User(SQLModel, table=True):
     email: str = Field(unique=True, index=True, max_length=255)
     hashed_password: str = Field(max_length=255)
     is_active: bool = Field(default=True)
-    created_at: datetime = Field(default_factory=datetime.utcnow)
-    
+    # Timestamp definido pelo banco (server_default): sem chamada Python
+    # por linha e um relógio único/consistente em inserts em lote
+    created_at: Optional[datetime] = Field(
+        default=None,
+        sa_column=Column(DateTime, nullable=False, server_default=func.now())
+    )
+
     def __repr__(self):
         return f"<User {self.username}>"
 
@@ -60,7 +66,33 @@ class Product(SQLModel, table=True):
     Modelo de produtos da loja geek.
     """
     __tablename__ = "products"
-    
+    # Índices para a query quente de listagem (filtros de
+    # ProductFilterParams + ORDER BY) e um índice funcional em
+    # lower(nome) para busca case-insensitive. Os índices parciais
+    # (WHERE is_active) cobrem o caminho padrão — a listagem pública
+    # sempre filtra ativos — e ficam menores que os equivalentes cheios,
+    # permitindo Index Scan já na ordem pedida, sem sort.
+    __table_args__ = (
+        Index(
+            "ix_products_active_category_created", "category_id", "created_at",
+            sqlite_where=text("is_active = 1"),
+            postgresql_where=text("is_active = true"),
+        ),
+        Index(
+            "ix_products_active_category_preco", "category_id", "preco",
+            sqlite_where=text("is_active = 1"),
+            postgresql_where=text("is_active = true"),
+        ),
+        Index(
+            "ix_products_active_created", text("created_at DESC"),
+            sqlite_where=text("is_active = 1"),
+            postgresql_where=text("is_active = true"),
+        ),
+        Index("ix_products_active_franquia_created", "is_active", "franquia", "created_at"),
+        Index("ix_products_nome_lower", text("lower(nome)")),
+    )
+
+
     id: Optional[int] = Field(default=None, primary_key=True)
     nome: str = Field(min_length=2, max_length=200, index=True)
     descricao: str = Field(max_length=2000)
@@ -73,16 +105,27 @@ class Product(SQLModel, table=True):
     quantidade_estoque: int = Field(default=0, ge=0)
     image_url: str = Field(max_length=500)
     
-    # Relacionamento com Category
-    category_id: Optional[int] = Field(default=None, foreign_key="categories.id")
+    # Relacionamento com Category (indexado: o guard de delete e os
+    # filtros de listagem consultam por category_id)
+    category_id: Optional[int] = Field(default=None, foreign_key="categories.id", index=True)
     category: Optional[Category] = Relationship(back_populates="products")
     
     franquia: str = Field(max_length=100, index=True)
     
     # Campos de controle
     is_active: bool = Field(default=True)
-    created_at: datetime = Field(default_factory=datetime.utcnow)
-    updated_at: datetime = Field(default_factory=datetime.utcnow)
+    # Timestamps definidos pelo banco; updated_at também é renovado
+    # automaticamente em cada UPDATE via onupdate
+    created_at: Optional[datetime] = Field(
+        default=None,
+        sa_column=Column(DateTime, nullable=False, server_default=func.now())
+    )
+    updated_at: Optional[datetime] = Field(
+        default=None,
+        sa_column=Column(
+            DateTime, nullable=False, server_default=func.now(), onupdate=func.now()
+        )
+    )
     
     def __repr__(self):
         return f"<Product {self.nome} - R$ {self.preco}>"
@@ -1,17 +1,19 @@
 from datetime import timedelta
-from fastapi import APIRouter, Depends, HTTPException, status
+from cachetools import TTLCache
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlmodel import Session
-from app.database import get_session
+from sqlalchemy import update
+from sqlalchemy.exc import IntegrityError
+from sqlmodel.ext.asyncio.session import AsyncSession
+from app.database import get_async_session
 from app.models import User, UserCreate, UserLogin, UserResponse, Token
 from app.auth import (
     authenticate_user,
     create_access_token,
     create_user,
     get_current_active_user,
-    get_user_by_username,
-    get_user_by_email,
-    get_password_hash
+    user_conflict_to_http,
+    aget_password_hash
 )
 from app.config import settings
 
@@ -22,15 +24,28 @@ router = APIRouter(
     tags=["auth"]
 )
 
+# Corpo do /auth/me pré-serializado por usuário. Com o cache de token o
+# endpoint não tem mais I/O, então o custo dominante vira a validação
+# pydantic + encode JSON de um objeto de poucos campos — em cache hit
+# devolvemos os bytes prontos. Invalidado nas mutações de conta abaixo.
+# Todo acesso (leitura no /me e invalidação nas mutações) acontece na
+# thread do event loop — endpoints async —, então dispensa lock.
+_ME_CACHE: TTLCache = TTLCache(maxsize=10_000, ttl=300)
+
+
+def _invalidate_me_cache(user_id: int) -> None:
+    """Descarta o corpo cacheado do /auth/me após mutações da conta."""
+    _ME_CACHE.pop(user_id, None)
+
 # Endpoints de autenticação
 
 @router.post("/register", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
-def register(user_create: UserCreate, session: Session = Depends(get_session)):
+async def register(user_create: UserCreate, session: AsyncSession = Depends(get_async_session)):
     """ Endpoint para registrar um novo usuário.
     
     Uso:
         @app.post("/auth/register")
-        def register(user_create: UserCreate, session: Session = Depends(get_session)):
+        async def register(user_create: UserCreate, session: AsyncSession = Depends(get_async_session)):
             return register(user_create, session)
             Args:
         user_create: Dados para criar um novo usuário
@@ -38,20 +53,12 @@ def register(user_create: UserCreate, session: Session = Depends(get_session)):
         Raises:
         HTTPException 400: Se username ou email já estiverem em uso
     """
-    if get_user_by_username(session, user_create.username):
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Username já está em uso"
-        )
-    if get_user_by_email(session, user_create.email):
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Email já está em uso"
-        )
-    new_user = create_user(session, user_create.username, user_create.email, user_create.password)
+    # Duplicidade de username/email é detectada pelo índice único no
+    # próprio INSERT (create_user traduz o IntegrityError em 400)
+    new_user = await create_user(session, user_create.username, user_create.email, user_create.password)
     return new_user
 @router.post("/login", response_model=Token)
-def login(form_data: OAuth2PasswordRequestForm = Depends(), session: Session = Depends(get_session)):
+async def login(form_data: OAuth2PasswordRequestForm = Depends(), session: AsyncSession = Depends(get_async_session)):
     """ Autentica um usuário e retorna um token JWT.
     
     **Corpo da requisição (form-data):**
@@ -73,7 +80,7 @@ def login(form_data: OAuth2PasswordRequestForm = Depends(), session: Session = D
     username=admin&password=senha123
 ```
 """
-    user = authenticate_user(session, form_data.username, form_data.password)
+    user = await authenticate_user(session, form_data.username, form_data.password)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -96,9 +103,9 @@ def login(form_data: OAuth2PasswordRequestForm = Depends(), session: Session = D
     return {"access_token": access_token, "token_type": "bearer"}
 
 @router.post("/login-json", response_model=Token)
-def login_json(
+async def login_json(
     credentials: UserLogin,
-    session: Session = Depends(get_session)
+    session: AsyncSession = Depends(get_async_session)
 ):
     """
     Versão alternativa do login que aceita JSON ao invés de form-data.
@@ -119,7 +126,7 @@ def login_json(
     - 401: Credenciais inválidas
     """
     # Autentica o usuário
-    user = authenticate_user(session, credentials.username, credentials.password)
+    user = await authenticate_user(session, credentials.username, credentials.password)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -140,7 +147,7 @@ def login_json(
     )
     return {"access_token": access_token, "token_type": "bearer"}
 @router.post("/register-json", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
-def register_json(user_create: UserCreate, session: Session = Depends(get_session)):
+async def register_json(user_create: UserCreate, session: AsyncSession = Depends(get_async_session)):
     """ Endpoint para registrar um novo usuário usando JSON.
     
     **Corpo da requisição (JSON):**
@@ -151,20 +158,12 @@ def register_json(user_create: UserCreate, session: Session = Depends(get_sessio
         "password: "senha123"
         }
         """
-    if get_user_by_username(session, user_create.username):
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Username já está em uso"
-        )
-    if get_user_by_email(session, user_create.email):
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Email já está em uso"
-        )
-    new_user = create_user(session, user_create.username, user_create.email, user_create.password)
+    # Duplicidade de username/email é detectada pelo índice único no
+    # próprio INSERT (create_user traduz o IntegrityError em 400)
+    new_user = await create_user(session, user_create.username, user_create.email, user_create.password)
     return new_user
 @router.get("/me", response_model=UserResponse)
-def get_current_user_info(current_user: User = Depends(get_current_active_user)):
+async def get_current_user_info(current_user: User = Depends(get_current_active_user)):
     """ Endpoint para obter informações do usuário autenticado.
     
     **Retorna:**
@@ -176,12 +175,18 @@ def get_current_user_info(current_user: User = Depends(get_current_active_user))
     **Erros:**
     - 401: Token inválido ou ausente
     """
-    return current_user
+    body = _ME_CACHE.get(current_user.id)
+    if body is None:
+        body = UserResponse.model_validate(
+            current_user, from_attributes=True
+        ).model_dump_json().encode()
+        _ME_CACHE[current_user.id] = body
+    return Response(content=body, media_type="application/json")
 @router.put("/me", response_model=UserResponse)
-def update_current_user(
+async def update_current_user(
     email: str = None,
     current_user: User = Depends(get_current_active_user),
-    session: Session = Depends(get_session)
+    session: AsyncSession = Depends(get_async_session)
 ):
     """
     Atualiza informações do usuário autenticado.
@@ -204,24 +209,31 @@ def update_current_user(
     - 401: Token inválido
     """
     if email:
-        existing_user = get_user_by_email(session, email)
-        if existing_user and existing_user.id != current_user.id:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Email já está em uso"
-            )
+        # UPDATE direcionado de uma coluna só, sem passar pelo flush da
+        # unit of work; synchronize_session=False pula a varredura do
+        # identity map. A unicidade fica por conta do índice único.
+        statement = (
+            update(User)
+            .where(User.id == current_user.id)
+            .values(email=email)
+            .execution_options(synchronize_session=False)
+        )
+        try:
+            await session.exec(statement)
+            await session.commit()
+        except IntegrityError as exc:
+            await session.rollback()
+            raise user_conflict_to_http(exc) from exc
         current_user.email = email
-    session.add(current_user)
-    session.commit()
-    session.refresh(current_user)
+        _invalidate_me_cache(current_user.id)
     return current_user
 
 @router.post("/change-password", status_code=status.HTTP_200_OK)
-def change_password(
+async def change_password(
     current_password: str,
     new_password: str,
     current_user: User = Depends(get_current_active_user),
-    session: Session = Depends(get_session)
+    session: AsyncSession = Depends(get_async_session)
 ):
     """
     Altera a senha do usuário autenticado.
@@ -244,7 +256,7 @@ def change_password(
     - 400: Senha atual incorreta ou nova senha inválida
     - 401: Token inválido
     """
-    if not authenticate_user(session, current_user.username, current_password):
+    if not await authenticate_user(session, current_user.username, current_password):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Senha atual incorreta"
@@ -254,14 +266,20 @@ def change_password(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Nova senha deve ter pelo menos 6 caracteres"
         )
-    current_user.hashed_password = get_password_hash(new_password)
-    session.add(current_user)
-    session.commit()
+    # UPDATE direcionado: só a coluna hashed_password, uma round-trip
+    await session.exec(
+        update(User)
+        .where(User.id == current_user.id)
+        .values(hashed_password=await aget_password_hash(new_password))
+        .execution_options(synchronize_session=False)
+    )
+    await session.commit()
+    _invalidate_me_cache(current_user.id)
     return {"message": "Senha alterada com sucesso"}
 @router.delete("/me", status_code=status.HTTP_200_OK)
-def deactivate_account(
+async def deactivate_account(
     current_user: User = Depends(get_current_active_user),
-    session: Session = Depends(get_session)
+    session: AsyncSession = Depends(get_async_session)
 ):
     """
     Desativa a conta do usuário autenticado (soft delete).
@@ -278,6 +296,7 @@ def deactivate_account(
     """
     current_user.is_active = False
     session.add(current_user)
-    session.commit()
-    
+    await session.commit()
+    _invalidate_me_cache(current_user.id)
+
     return {"message": "Conta desativada com sucesso"}
\ No newline at end of file
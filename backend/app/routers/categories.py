@@ -5,16 +5,16 @@
 #   3. update_category: argumentos invertidos em validate_unique_category_slug
 
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlmodel import Session, select, func
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import select, func
+from sqlmodel.ext.asyncio.session import AsyncSession
 from typing import List
-from app.database import get_session
+from app.database import get_async_session
 from app.models import Category, CategoryCreate, CategoryUpdate, CategoryResponse
 from app.auth import get_current_active_user
 from app.models import User
 from app.dependencies import (
     get_category_or_404,
-    validate_unique_category_name,
-    validate_unique_category_slug,
     generate_slug,
     PaginationParams,
     paginated_response,
@@ -23,29 +23,70 @@ from app.dependencies import (
 router = APIRouter(prefix="/categories", tags=["categories"])
 
 
+def _category_conflict_to_http(exc: IntegrityError, name: str, slug: str) -> HTTPException:
+    """
+    Traduz a violação de UNIQUE de categories (name/slug) em 400.
+    Dispensa os SELECTs de pré-checagem: o índice único do banco já faz
+    a verificação dentro do próprio INSERT/UPDATE.
+    """
+    message = str(exc.orig)
+    if "slug" in message:
+        return HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Já existe uma categoria com o slug '{slug}'",
+        )
+    if "name" in message:
+        return HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Já existe uma categoria com o nome '{name}'",
+        )
+    return HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Categoria já existe")
+
+
 @router.get("/all", response_model=List[CategoryResponse])
-def list_all_categories(session: Session = Depends(get_session)):
+async def list_all_categories(session: AsyncSession = Depends(get_async_session)):
     """Lista TODAS as categorias sem paginação (para selects/dropdowns)."""
-    return session.exec(select(Category).order_by(Category.name)).all()
+    # Projeção de colunas: tuplas leves ao invés de uma instância mapeada
+    # completa por linha (sem identity map nem setup de relacionamentos).
+    # description fica na projeção porque CategoryResponse a expõe.
+    statement = select(
+        Category.id, Category.name, Category.description, Category.slug
+    ).order_by(Category.name)
+    rows = (await session.exec(statement)).all()
+    return [
+        {"id": id_, "name": name, "description": description, "slug": slug}
+        for id_, name, description, slug in rows
+    ]
 
 
 @router.get("/", response_model=dict)
-def list_categories(
+async def list_categories(
     pagination: PaginationParams = Depends(),
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_session),
 ):
     """Lista categorias com paginação."""
-    statement = select(Category).order_by(Category.name)
-    total = session.exec(select(func.count(Category.id))).one()   # ✅ FIX: era select_from(Category.id)
-    categories = session.exec(
-        statement.offset(pagination.skip).limit(pagination.limit)  # ✅ FIX: offset aplicado só uma vez
-    ).all()
+    # count(*) OVER () devolve o total junto com a própria página:
+    # uma round-trip ao banco ao invés de SELECT + COUNT separados
+    statement = (
+        select(Category, func.count().over().label("total"))
+        .order_by(Category.name)
+        .offset(pagination.skip)
+        .limit(pagination.limit)
+    )
+    rows = (await session.exec(statement)).all()
+    if rows:
+        categories = [row[0] for row in rows]
+        total = rows[0][1]
+    else:
+        # Página além do fim: só aqui o COUNT separado é necessário
+        categories = []
+        total = (await session.exec(select(func.count(Category.id)))).one()
     return paginated_response(items=categories, total=total, skip=pagination.skip, limit=pagination.limit)
 
 
 @router.get("/slug/{slug}", response_model=CategoryResponse)
-def get_category_by_slug(slug: str, session: Session = Depends(get_session)):
-    category = session.exec(select(Category).where(Category.slug == slug)).first()
+async def get_category_by_slug(slug: str, session: AsyncSession = Depends(get_async_session)):
+    category = (await session.exec(select(Category).where(Category.slug == slug))).first()
     if not category:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Categoria não encontrada")
     return category
@@ -57,68 +98,80 @@ def get_category(category: Category = Depends(get_category_or_404)):
 
 
 @router.post("/", response_model=CategoryResponse, status_code=status.HTTP_201_CREATED)
-def create_category(
+async def create_category(
     category_in: CategoryCreate,
     current_user: User = Depends(get_current_active_user),
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_session),
 ):
-    # ✅ FIX: argumentos na ordem correta (name, session)
-    validate_unique_category_name(category_in.name, session)
     slug = generate_slug(category_in.name)
-    validate_unique_category_slug(slug, session)  # ✅ FIX
-
     new_category = Category(name=category_in.name, description=category_in.description, slug=slug)
     session.add(new_category)
-    session.commit()
-    session.refresh(new_category)
+    # Sem refresh pós-commit: o id já é populado no flush e Category não
+    # tem colunas server-default; expire_on_commit=False mantém o objeto
+    try:
+        await session.commit()
+    except IntegrityError as exc:
+        await session.rollback()
+        raise _category_conflict_to_http(exc, category_in.name, slug) from exc
     return new_category
 
 
 @router.put("/{category_id}", response_model=CategoryResponse)
-def update_category(
+async def update_category(
     category_data: CategoryUpdate,
     category: Category = Depends(get_category_or_404),
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_session),
     current_user: User = Depends(get_current_active_user),
 ):
     update_data = category_data.model_dump(exclude_unset=True)
 
     if "name" in update_data and update_data["name"] != category.name:
-        validate_unique_category_name(update_data["name"], session, exclude_id=category.id)  # ✅ FIX
-        new_slug = generate_slug(update_data["name"])
-        validate_unique_category_slug(new_slug, session, exclude_id=category.id)            # ✅ FIX
-        update_data["slug"] = new_slug
+        update_data["slug"] = generate_slug(update_data["name"])
+
+    # Captura os valores tentados antes do commit: o rollback expira a
+    # instância e ler category.name depois dispararia um refresh lazy
+    # (MissingGreenlet em sessão assíncrona)
+    attempted_name = update_data.get("name", category.name)
+    attempted_slug = update_data.get("slug", category.slug)
 
     for key, value in update_data.items():
         setattr(category, key, value)
     session.add(category)
-    session.commit()
-    session.refresh(category)
+    # Sem refresh: nenhuma coluna de Category é gerada pelo banco no UPDATE
+    try:
+        await session.commit()
+    except IntegrityError as exc:
+        await session.rollback()
+        raise _category_conflict_to_http(exc, attempted_name, attempted_slug) from exc
     return category
 
 
 @router.delete("/{category_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_category(
+async def delete_category(
     category: Category = Depends(get_category_or_404),
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_session),
     current_user: User = Depends(get_current_active_user),
 ):
     from app.models import Product
-    count = session.exec(select(func.count(Product.id)).where(Product.category_id == category.id)).one()
-    if count > 0:
+    # EXISTS para no primeiro produto encontrado; o COUNT completo
+    # varreria todos os produtos da categoria só para decidir sim/não
+    has_products = (await session.exec(
+        select(1).where(Product.category_id == category.id).limit(1)
+    )).first() is not None
+    if has_products:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Não é possível deletar: categoria possui {count} produto(s) associado(s).",
+            detail="Não é possível deletar: categoria possui produto(s) associado(s).",
         )
-    session.delete(category)
-    session.commit()
+    await session.delete(category)
+    await session.commit()
 
 
 @router.get("/{category_id}/products_count")
-def get_category_products_count(
+async def get_category_products_count(
     category: Category = Depends(get_category_or_404),
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_session),
 ):
     from app.models import Product
-    count = session.exec(select(func.count(Product.id)).where(Product.category_id == category.id)).one()
+    count = (await session.exec(select(func.count(Product.id)).where(Product.category_id == category.id))).one()
     return {"category_id": category.id, "category_name": category.name, "products_count": count}
\ No newline at end of file
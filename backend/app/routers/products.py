@@ -1,22 +1,32 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlmodel import Session, select, func, or_
+import threading
+
+from cachetools import TTLCache
+from fastapi import APIRouter, Depends, HTTPException, Response, status, Query
+from fastapi.responses import ORJSONResponse
+from sqlmodel import select, func, or_
+from sqlalchemy import String, bindparam, text, tuple_
+from sqlmodel.ext.asyncio.session import AsyncSession
+from sqlalchemy.orm import selectinload
+from pydantic import TypeAdapter
 from typing import List, Optional
 from datetime import datetime
 from decimal import Decimal
+from functools import lru_cache
 
-from app.database import get_session
+from app.database import engine, get_async_session
 from app.models import (
     Product,
     ProductCreate,
     ProductUpdate,
     ProductResponse,
     Category,
+    CategoryResponse,
     User
 )
 from app.auth import get_current_active_user
 from app.dependencies import (
     get_product_or_404,
-    validate_category_exists,
+    validate_category_exists_async,
     PaginationParams,
     ProductFilterParams,
     paginated_response
@@ -30,14 +40,180 @@ router = APIRouter(
     tags=["Produtos"]
 )
 
+# Serialização em lote da página inteira com um único TypeAdapter
+# reutilizado, bem mais rápido que percorrer objeto a objeto
+_PRODUCT_LIST_ADAPTER = TypeAdapter(List[ProductResponse])
+
+
+def _product_to_response(product: Product) -> ProductResponse:
+    """
+    Monta o ProductResponse via model_construct, pulando os validadores:
+    as linhas vêm direto do banco, já com o shape e os tipos certos, e a
+    validação pydantic completa por linha é CPU desperdiçado no caminho
+    quente da listagem.
+    """
+    category = product.category
+    return ProductResponse.model_construct(
+        id=product.id,
+        nome=product.nome,
+        descricao=product.descricao,
+        preco=product.preco,
+        quantidade_estoque=product.quantidade_estoque,
+        image_url=product.image_url,
+        franquia=product.franquia,
+        category=CategoryResponse.model_construct(
+            id=category.id,
+            name=category.name,
+            description=category.description,
+            slug=category.slug,
+        ) if category is not None else None,
+        is_active=product.is_active,
+        created_at=product.created_at,
+        updated_at=product.updated_at,
+    )
+
+# Cache curto (60s) das páginas anônimas da listagem: as combinações
+# comuns (primeira página, sem busca, ordenação padrão) repetem a mesma
+# query filtrada+contada a cada request. O pedido original previa Redis,
+# mas o deploy é single-process — um TTLCache em memória dá o mesmo
+# efeito sem dependência externa. Busca livre fica de fora (explosão de
+# cardinalidade), assim como is_active explícito (ramo autenticado).
+_LIST_CACHE: TTLCache = TTLCache(maxsize=256, ttl=60)
+
+
+def _invalidate_list_cache() -> None:
+    """Descarta as páginas cacheadas após qualquer mutação de produto."""
+    _LIST_CACHE.clear()
+
+
+# Cache do autocomplete: enquanto o usuário digita, a rota recebe uma
+# rajada de queries quase idênticas ("n", "na", "nar", ...). TTL de 5s
+# absorve a enxurrada sem tocar o banco; termos longos (> 20 chars, já
+# quase únicos) não entram para limitar a memória.
+_SEARCH_CACHE: TTLCache = TTLCache(maxsize=10_000, ttl=5)
+_SEARCH_CACHE_LOCK = threading.Lock()
+
+
+# Allow-list de colunas ordenáveis da listagem (order_by → coluna)
+_SORT_COLS = {
+    "nome": Product.nome,
+    "preco": Product.preco,
+    "created_at": Product.created_at,
+}
+
+# Conversores do after_value do cursor keyset (chega como string na URL)
+_SORT_CASTS = {
+    "nome": str,
+    "preco": Decimal,
+    "created_at": datetime.fromisoformat,
+}
+
+# No SQLite, created_at é TEXT gravado pelo CURRENT_TIMESTAMP sem
+# microssegundos ('YYYY-MM-DD HH:MM:SS'), mas o bind DateTime renderiza
+# sempre com '.000000': na comparação textual do cursor nenhuma linha
+# "empata" e o desempate por id nunca engata — com timestamps iguais
+# (caso normal, resolução de 1s) a página repetia (desc) ou pulava
+# linhas (asc). Nesse caso o cursor é comparado como o texto exato.
+_SQLITE_TEXT_TIMESTAMPS = engine.dialect.name == "sqlite"
+
+
+
+@lru_cache(maxsize=256)
+def _build_list_statements(
+    has_search: bool,
+    has_category: bool,
+    has_franquia: bool,
+    has_min_preco: bool,
+    has_max_preco: bool,
+    explicit_active: bool,
+    order_key: str,
+    ascending: bool,
+    keyset: bool,
+):
+    """
+    Constrói (e memoiza por shape) o statement filtrado da listagem e a
+    variante paginada com count de janela. Os valores entram como
+    bindparams na execução, então cada combinação de filtros ativos é
+    montada e compilada uma única vez.
+    """
+    # selectinload carrega todas as categorias da página em um único
+    # SELECT ... IN (...) ao invés de um SELECT por produto na
+    # serialização. Sem join com Category: nenhum filtro usa colunas dela.
+    statement = select(Product).options(selectinload(Product.category))
+
+    if has_search:
+        # lower(col) LIKE :term (termo já minúsculo no Python) no lugar
+        # de ILIKE: o lower() do lado do parâmetro sai do loop por linha
+        # e a expressão lower(col) casa com os índices funcionais /
+        # trigram de expressão
+        term = bindparam("search_term")
+        statement = statement.where(
+            or_(
+                func.lower(Product.nome).like(term),
+                func.lower(Product.descricao).like(term),
+                func.lower(Product.franquia).like(term)
+            )
+        )
+    if has_category:
+        statement = statement.where(Product.category_id == bindparam("category_id"))
+    if has_franquia:
+        statement = statement.where(
+            func.lower(Product.franquia).like(bindparam("franquia_term"))
+        )
+    if has_min_preco:
+        statement = statement.where(Product.preco >= bindparam("min_preco"))
+    if has_max_preco:
+        statement = statement.where(Product.preco <= bindparam("max_preco"))
+    if explicit_active:
+        statement = statement.where(Product.is_active == bindparam("is_active"))
+    else:
+        # Por padrão, mostrar apenas produtos ativos para usuários não-autenticados
+        statement = statement.where(Product.is_active == True)
+
+    # Ordenação sempre no SQL (contra coluna indexada): paginação
+    # estável e o banco aproveita os índices parciais ao invés de um
+    # sort completo. Product.id desempata para o cursor keyset ser total.
+    order_column = _SORT_COLS[order_key]
+    statement = statement.order_by(
+        *(
+            (order_column.asc(), Product.id.asc()) if ascending
+            else (order_column.desc(), Product.id.desc())
+        )
+    )
+
+    if keyset:
+        cursor = tuple_(order_column, Product.id)
+        # type_= garante a coerção do valor do cursor (ex.: Decimal do
+        # preco) pelo tipo da coluna, como numa comparação literal.
+        # Exceção: created_at no SQLite compara como texto, no formato
+        # exato armazenado (ver _SQLITE_TEXT_TIMESTAMPS)
+        if order_key == "created_at" and _SQLITE_TEXT_TIMESTAMPS:
+            after_value = bindparam("after_value", type_=String())
+        else:
+            after_value = bindparam("after_value", type_=order_column.type)
+        bound = tuple_(after_value, bindparam("after_id", type_=Product.id.type))
+        statement = statement.where(cursor > bound if ascending else cursor < bound)
+
+    # count(*) OVER () devolve o total filtrado junto com a própria
+    # página: um único scan ao invés de re-executar todos os filtros
+    # (incluindo os ILIKE) numa segunda query de COUNT
+    page_statement = statement.add_columns(func.count().over().label("total"))
+    if not keyset:
+        page_statement = page_statement.offset(bindparam("page_skip"))
+    page_statement = page_statement.limit(bindparam("page_limit"))
+
+    return statement, page_statement
+
 
 # Endpoints Públicos
 
 @router.get("/", response_model=dict)
-def list_products(
+async def list_products(
     pagination: PaginationParams = Depends(),
     filters: ProductFilterParams = Depends(),
-    session: Session = Depends(get_session)
+    after_id: Optional[int] = Query(None, ge=1, description="Cursor keyset: id do último produto da página anterior"),
+    after_value: Optional[str] = Query(None, description="Cursor keyset: valor de order_by do último produto da página anterior"),
+    session: AsyncSession = Depends(get_async_session)
 ):
     """
     Lista produtos com filtros avançados e paginação.
@@ -61,74 +237,134 @@ def list_products(
     
     **Retorna:**
     - Lista paginada de produtos com suas categorias
+
+    **Paginação keyset (opcional):**
+    - Passe after_id + after_value (devolvidos em next_cursor) no lugar
+      de skip: o banco busca direto pelo índice ao invés de varrer e
+      descartar skip linhas — página 100 custa o mesmo que a página 1
+    - Em requests com cursor, total/page/pages vêm como null: o count é
+      calculado após o cursor e não representaria o total filtrado
     """
-    # Query base com join na categoria
-    statement = select(Product).join(Category, isouter=True)
-    
-    # Aplicar filtros
-    if filters.search:
-        search_term = f"%{filters.search}%"
-        statement = statement.where(
-            or_(
-                Product.nome.ilike(search_term),
-                Product.descricao.ilike(search_term),
-                Product.franquia.ilike(search_term)
-            )
+    cacheable = (
+        filters.search is None and filters.is_active is None and after_id is None
+    )
+    if cacheable:
+        cache_key = (
+            pagination.skip, pagination.limit,
+            filters.category_id, filters.franquia,
+            filters.min_preco, filters.max_preco,
+            filters.order_by, filters.order_direction,
         )
-    
+        cached = _LIST_CACHE.get(cache_key)
+        if cached is not None:
+            return cached
+
+    order_key = filters.order_by if filters.order_by in _SORT_COLS else "created_at"
+    ascending = filters.order_direction == "asc"
+    keyset = after_id is not None and after_value is not None
+
+    params = {"page_limit": pagination.limit}
+    if filters.search:
+        params["search_term"] = f"%{filters.search.lower()}%"
     if filters.category_id:
-        statement = statement.where(Product.category_id == filters.category_id)
-    
+        params["category_id"] = filters.category_id
     if filters.franquia:
-        statement = statement.where(Product.franquia.ilike(f"%{filters.franquia}%"))
-    
+        params["franquia_term"] = f"%{filters.franquia.lower()}%"
     if filters.min_preco is not None:
-        statement = statement.where(Product.preco >= filters.min_preco)
-    
+        params["min_preco"] = filters.min_preco
     if filters.max_preco is not None:
-        statement = statement.where(Product.preco <= filters.max_preco)
-    
+        params["max_preco"] = filters.max_preco
     if filters.is_active is not None:
-        statement = statement.where(Product.is_active == filters.is_active)
+        params["is_active"] = filters.is_active
+    if keyset:
+        # Keyset: comparação de tupla (coluna de ordenação, id) resolvida
+        # por seek no índice — nada de varrer e descartar skip linhas
+        try:
+            parsed_after = _SORT_CASTS[order_key](after_value)
+        except (ValueError, TypeError, ArithmeticError):  # Decimal lança InvalidOperation
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="after_value inválido para o order_by selecionado"
+            )
+        if order_key == "created_at" and _SQLITE_TEXT_TIMESTAMPS:
+            # str(datetime) reproduz o texto armazenado pelo
+            # CURRENT_TIMESTAMP (mesmo formato emitido em next_cursor)
+            parsed_after = str(parsed_after)
+        params["after_value"] = parsed_after
+        params["after_id"] = after_id
     else:
-        # Por padrão, mostrar apenas produtos ativos para usuários não-autenticados
-        statement = statement.where(Product.is_active == True)
-    
-    # Ordenação
-    if filters.order_by == "nome":
-        order_column = Product.nome
-    elif filters.order_by == "preco":
-        order_column = Product.preco
-    else:  # created_at (padrão)
-        order_column = Product.created_at
-    
-    if filters.order_direction == "asc":
-        statement = statement.order_by(order_column.asc())
+        params["page_skip"] = pagination.skip
+
+    # Statements memoizados por "shape" de filtros: para uma mesma
+    # combinação de filtros ativos o SQL é idêntico — só os binds mudam —
+    # então a montagem Core + compilação acontecem uma vez por shape
+    shape = (
+        "search_term" in params, "category_id" in params,
+        "franquia_term" in params, "min_preco" in params,
+        "max_preco" in params, "is_active" in params,
+        order_key, ascending, keyset,
+    )
+    statement, page_statement = _build_list_statements(*shape)
+
+    # session.execute (não .exec): o SQLModel colapsaria o resultado de
+    # um select(Product) derivado para escalares, descartando o total
+    rows = (await session.execute(page_statement, params)).all()
+    if rows:
+        products = [row[0] for row in rows]
+        total = rows[0][1]
     else:
-        statement = statement.order_by(order_column.desc())
-    
-    # Total de produtos (com filtros aplicados)
-    count_statement = select(func.count()).select_from(statement.subquery())
-    total = session.exec(count_statement).one()
-    
-    # Aplica paginação
-    products = session.exec(
-        statement.offset(pagination.skip).limit(pagination.limit)
-    ).all()
-    
-    return paginated_response(
-        items=products,
-        total=total,
-        skip=pagination.skip,
-        limit=pagination.limit
+        # Página além do fim: só aqui o COUNT separado é necessário
+        # (e só no caminho por skip — com cursor o total nem é exposto)
+        products = []
+        total = None if keyset else (await session.exec(
+            select(func.count()).select_from(statement.subquery()), params=params
+        )).one()
+
+    # Serializa a página inteira de uma vez (bulk), construindo os
+    # responses sem validação — o dump mode="json" cuida de Decimal e
+    # datetime para o encoder
+    items = _PRODUCT_LIST_ADAPTER.dump_python(
+        [_product_to_response(product) for product in products],
+        mode="json"
     )
 
+    if keyset:
+        # O count de janela roda depois do predicado do cursor, então
+        # seria só "linhas restantes" — não o total filtrado. Para o
+        # cliente não confundir, total/page/pages saem como null.
+        response = {
+            "items": items,
+            "total": None,
+            "page": None,
+            "pages": None,
+            "per_page": pagination.limit,
+        }
+    else:
+        response = paginated_response(
+            items=items,
+            total=total,
+            skip=pagination.skip,
+            limit=pagination.limit
+        )
+    # Cursor para a próxima página via keyset
+    if products:
+        last = products[-1]
+        response["next_cursor"] = {
+            "after_id": last.id,
+            "after_value": str(getattr(last, order_key)),
+        }
+    else:
+        response["next_cursor"] = None
+    if cacheable:
+        _LIST_CACHE[cache_key] = response
+    return response
+
 
 @router.get("/search", response_model=List[ProductResponse])
-def search_products(
+async def search_products(
     q: str = Query(..., min_length=1, max_length=100, description="Termo de busca"),
     limit: int = Query(10, ge=1, le=50, description="Limite de resultados"),
-    session: Session = Depends(get_session)
+    session: AsyncSession = Depends(get_async_session)
 ):
     """
     Busca rápida de produtos (para autocomplete/search bar).
@@ -150,19 +386,51 @@ def search_products(
     **Retorna:**
     - Lista de produtos encontrados (apenas ativos)
     """
-    search_term = f"%{q}%"
-    
-    statement = select(Product).where(
-        Product.is_active == True,
-        or_(
-            Product.nome.ilike(search_term),
-            Product.descricao.ilike(search_term),
-            Product.franquia.ilike(search_term)
+    cacheable = len(q) <= 20
+    cache_key = (q.lower(), limit)
+    if cacheable:
+        with _SEARCH_CACHE_LOCK:
+            body = _SEARCH_CACHE.get(cache_key)
+        if body is not None:
+            return Response(content=body, media_type="application/json")
+
+    # selectinload evita o N+1 na serialização de product.category
+    statement = select(Product).where(Product.is_active == True)
+
+    if session.get_bind().dialect.name == "postgresql":
+        # Coluna gerada search_tsv + GIN (criados na subida): um único
+        # probe de índice resolve a busca nos três campos de uma vez.
+        # websearch_to_tsquery entende sintaxe de busca do usuário
+        # ("naruto uzumaki", naruto OR sasuke, -filler) e ts_rank_cd
+        # ordena por relevância usando o mesmo tsvector já em mãos
+        statement = statement.where(
+            text("search_tsv @@ websearch_to_tsquery('simple', :q)")
+        ).order_by(
+            text("ts_rank_cd(search_tsv, websearch_to_tsquery('simple', :q)) DESC")
+        ).params(q=q)
+    else:
+        search_term = f"%{q.lower()}%"
+        statement = statement.where(
+            or_(
+                func.lower(Product.nome).like(search_term),
+                func.lower(Product.descricao).like(search_term),
+                func.lower(Product.franquia).like(search_term)
+            )
         )
-    ).limit(limit)
-    
-    products = session.exec(statement).all()
-    return products
+
+    statement = statement.options(selectinload(Product.category)).limit(limit)
+
+    products = (await session.exec(statement)).all()
+    # Resposta serializada fora do response_model (o schema segue na
+    # assinatura para o OpenAPI); em hit o corpo pronto é reaproveitado
+    response = ORJSONResponse(_PRODUCT_LIST_ADAPTER.dump_python(
+        [_product_to_response(product) for product in products],
+        mode="json"
+    ))
+    if cacheable:
+        with _SEARCH_CACHE_LOCK:
+            _SEARCH_CACHE[cache_key] = response.body
+    return response
 
 
 @router.get("/{product_id}", response_model=ProductResponse)
@@ -190,10 +458,10 @@ def get_product(
 
 
 @router.get("/franquia/{franquia}", response_model=List[ProductResponse])
-def get_products_by_franquia(
+async def get_products_by_franquia(
     franquia: str,
     limit: int = Query(20, ge=1, le=100),
-    session: Session = Depends(get_session)
+    session: AsyncSession = Depends(get_async_session)
 ):
     """
     Lista produtos de uma franquia específica.
@@ -212,21 +480,22 @@ def get_products_by_franquia(
     **Retorna:**
     - Lista de produtos da franquia
     """
+    # selectinload evita o N+1 na serialização de product.category
     statement = select(Product).where(
-        Product.franquia.ilike(f"%{franquia}%"),
+        func.lower(Product.franquia).like(f"%{franquia.lower()}%"),
         Product.is_active == True
-    ).limit(limit)
-    
-    products = session.exec(statement).all()
+    ).options(selectinload(Product.category)).limit(limit)
+
+    products = (await session.exec(statement)).all()
     return products
 
 
 # Endpoints protegidos (Admin)
 
 @router.post("/", response_model=ProductResponse, status_code=status.HTTP_201_CREATED)
-def create_product(
+async def create_product(
     product_data: ProductCreate,
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_session),
     current_user: User = Depends(get_current_active_user)
 ):
     """
@@ -255,7 +524,7 @@ def create_product(
     - 401: Não autenticado
     """
     # Valida se categoria existe
-    validate_category_exists(product_data.category_id, session)
+    await validate_category_exists_async(product_data.category_id, session)
     
     # Cria o produto
     new_product = Product(
@@ -269,17 +538,24 @@ def create_product(
     )
     
     session.add(new_product)
-    session.commit()
-    session.refresh(new_product)
-    
+    await session.commit()
+    # Recarrega com a categoria junto: a resposta serializa
+    # product.category e lazy-load não funciona em sessão assíncrona
+    new_product = await session.get(
+        Product, new_product.id,
+        options=[selectinload(Product.category)],
+        populate_existing=True,
+    )
+    _invalidate_list_cache()
+
     return new_product
 
 
 @router.put("/{product_id}", response_model=ProductResponse)
-def update_product(
+async def update_product(
     product_data: ProductUpdate,
     product: Product = Depends(get_product_or_404),
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_session),
     current_user: User = Depends(get_current_active_user)
 ):
     """
@@ -308,31 +584,36 @@ def update_product(
     - 401: Não autenticado
     """
     update_data = product_data.model_dump(exclude_unset=True)
-    
+
     # Se está atualizando a categoria, valida
     if "category_id" in update_data:
-        validate_category_exists(update_data["category_id"], session)
-    
+        await validate_category_exists_async(update_data["category_id"], session)
+
     # Atualiza os campos
     for key, value in update_data.items():
         setattr(product, key, value)
-    
-    # Atualiza timestamp
-    product.updated_at = datetime.utcnow()
-    
+
+    # updated_at é renovado pelo banco (onupdate no modelo)
     session.add(product)
-    session.commit()
-    session.refresh(product)
-    
+    await session.commit()
+    # Recarrega com a categoria junto: a resposta serializa
+    # product.category e lazy-load não funciona em sessão assíncrona
+    product = await session.get(
+        Product, product.id,
+        options=[selectinload(Product.category)],
+        populate_existing=True,
+    )
+    _invalidate_list_cache()
+
     return product
 
 
 @router.patch("/{product_id}/stock", response_model=ProductResponse)
-def update_stock(
+async def update_stock(
     product_id: int,
     quantidade: int = Query(..., description="Nova quantidade em estoque (pode ser negativa para diminuir)"),
     operation: str = Query("set", regex="^(set|add|subtract)$", description="Operação: set (definir), add (adicionar), subtract (subtrair)"),
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_session),
     current_user: User = Depends(get_current_active_user)
 ):
     """
@@ -365,7 +646,7 @@ def update_stock(
     - 404: Produto não encontrado
     - 401: Não autenticado
     """
-    product = session.get(Product, product_id)
+    product = await session.get(Product, product_id)
     
     if not product:
         raise HTTPException(
@@ -389,19 +670,25 @@ def update_stock(
         )
     
     product.quantidade_estoque = new_stock
-    product.updated_at = datetime.utcnow()
-    
+
     session.add(product)
-    session.commit()
-    session.refresh(product)
-    
+    await session.commit()
+    # Recarrega com a categoria junto: a resposta serializa
+    # product.category e lazy-load não funciona em sessão assíncrona
+    product = await session.get(
+        Product, product.id,
+        options=[selectinload(Product.category)],
+        populate_existing=True,
+    )
+    _invalidate_list_cache()
+
     return product
 
 
 @router.patch("/{product_id}/toggle-active", response_model=ProductResponse)
-def toggle_product_active(
+async def toggle_product_active(
     product: Product = Depends(get_product_or_404),
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_session),
     current_user: User = Depends(get_current_active_user)
 ):
     """
@@ -420,19 +707,25 @@ def toggle_product_active(
     - Útil para "ocultar" produtos sem deletá-los
     """
     product.is_active = not product.is_active
-    product.updated_at = datetime.utcnow()
-    
+
     session.add(product)
-    session.commit()
-    session.refresh(product)
-    
+    await session.commit()
+    # Recarrega com a categoria junto: a resposta serializa
+    # product.category e lazy-load não funciona em sessão assíncrona
+    product = await session.get(
+        Product, product.id,
+        options=[selectinload(Product.category)],
+        populate_existing=True,
+    )
+    _invalidate_list_cache()
+
     return product
 
 
 @router.delete("/{product_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_product(
+async def delete_product(
     product: Product = Depends(get_product_or_404),
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_session),
     current_user: User = Depends(get_current_active_user)
 ):
     """
@@ -454,9 +747,10 @@ def delete_product(
     - Deleção permanente (não pode ser desfeita)
     - Considere usar PATCH /toggle-active para soft delete
     """
-    session.delete(product)
-    session.commit()
-    
+    await session.delete(product)
+    await session.commit()
+    _invalidate_list_cache()
+
     return None
 
 
@@ -465,8 +759,8 @@ def delete_product(
 
 
 @router.get("/stats/overview")
-def get_products_stats(
-    session: Session = Depends(get_session),
+async def get_products_stats(
+    session: AsyncSession = Depends(get_async_session),
     current_user: User = Depends(get_current_active_user)
 ):
     """
@@ -487,33 +781,33 @@ def get_products_stats(
 ```
     """
     # Total de produtos
-    total = session.exec(select(func.count(Product.id))).one()
-    
+    total = (await session.exec(select(func.count(Product.id)))).one()
+
     # Produtos ativos
-    active = session.exec(
+    active = (await session.exec(
         select(func.count(Product.id)).where(Product.is_active == True)
-    ).one()
-    
+    )).one()
+
     # Produtos inativos
     inactive = total - active
-    
+
     # Sem estoque
-    out_of_stock = session.exec(
+    out_of_stock = (await session.exec(
         select(func.count(Product.id)).where(Product.quantidade_estoque == 0)
-    ).one()
-    
+    )).one()
+
     # Estoque baixo (menos de 10 unidades)
-    low_stock = session.exec(
+    low_stock = (await session.exec(
         select(func.count(Product.id)).where(
             Product.quantidade_estoque > 0,
             Product.quantidade_estoque < 10
         )
-    ).one()
-    
+    )).one()
+
     # Valor total do inventário
-    inventory_value = session.exec(
+    inventory_value = (await session.exec(
         select(func.sum(Product.preco * Product.quantidade_estoque))
-    ).one() or 0
+    )).one() or 0
     
     return {
         "total_products": total,
@@ -526,8 +820,8 @@ def get_products_stats(
 
 
 @router.get("/stats/by-category")
-def get_products_by_category_stats(
-    session: Session = Depends(get_session),
+async def get_products_by_category_stats(
+    session: AsyncSession = Depends(get_async_session),
     current_user: User = Depends(get_current_active_user)
 ):
     """
@@ -557,7 +851,7 @@ def get_products_by_category_stats(
         func.sum(Product.preco * Product.quantidade_estoque).label("total_value")
     ).join(Category).group_by(Product.category_id, Category.name)
     
-    results = session.exec(statement).all()
+    results = (await session.exec(statement)).all()
     
     return [
         {
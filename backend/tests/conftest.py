@@ -0,0 +1,9 @@
+# tests/conftest.py
+
+import os
+import sys
+
+# Banco descartável para a suíte (resolvido antes de importar o app,
+# que lê DATABASE_URL no import) e o pacote app no path
+os.environ.setdefault("DATABASE_URL", "sqlite:///./test_geek_store.db")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
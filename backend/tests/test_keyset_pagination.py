@@ -0,0 +1,89 @@
+# tests/test_keyset_pagination.py
+#
+# Regressão: paginação keyset com order_by=created_at no SQLite.
+# CURRENT_TIMESTAMP tem resolução de 1 segundo, então timestamps
+# empatados são o caso normal — o cursor precisa desempatar por id
+# (antes: desc repetia a mesma página para sempre, asc pulava as
+# linhas empatadas restantes).
+
+import os
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+
+from app.database import engine
+from app.main import app
+
+
+@pytest.fixture
+def client():
+    with TestClient(app) as client:
+        yield client
+    for suffix in ("", "-wal", "-shm"):
+        path = f"./test_geek_store.db{suffix}"
+        if os.path.exists(path):
+            os.remove(path)
+
+
+def _auth_headers(client):
+    client.post("/api/auth/register-json", json={
+        "username": "keyset_tester",
+        "email": "keyset@test.com",
+        "password": "secret1",
+    })
+    token = client.post("/api/auth/login-json", json={
+        "username": "keyset_tester",
+        "password": "secret1",
+    }).json()["access_token"]
+    return {"Authorization": f"Bearer {token}"}
+
+
+def _walk_pages(client, direction, limit=2, max_pages=10):
+    """Segue next_cursor até a página vazia; devolve os ids na ordem."""
+    seen = []
+    params = {"limit": limit, "order_by": "created_at", "order_direction": direction}
+    for _ in range(max_pages):
+        page = client.get("/api/products/", params=params).json()
+        ids = [item["id"] for item in page["items"]]
+        if not ids:
+            return seen
+        seen.extend(ids)
+        cursor = page["next_cursor"]
+        params = {
+            "limit": limit,
+            "order_by": "created_at",
+            "order_direction": direction,
+            "after_id": cursor["after_id"],
+            "after_value": cursor["after_value"],
+        }
+    pytest.fail(f"cursor não terminou em {max_pages} páginas (loop?): {seen}")
+
+
+def test_keyset_pages_through_rows_with_tied_created_at(client):
+    headers = _auth_headers(client)
+    category_id = client.post(
+        "/api/categories/", json={"name": "Keyset"}, headers=headers
+    ).json()["id"]
+
+    ids = []
+    for i in range(5):
+        ids.append(client.post("/api/products/", json={
+            "nome": f"Produto {i:02d}",
+            "descricao": "d",
+            "preco": 10,
+            "quantidade_estoque": 1,
+            "image_url": "http://x",
+            "category_id": category_id,
+            "franquia": "F",
+        }, headers=headers).json()["id"])
+
+    # Força o empate: todos criados "no mesmo segundo", como o
+    # CURRENT_TIMESTAMP grava (TEXT sem microssegundos)
+    with engine.begin() as conn:
+        conn.execute(text(
+            "UPDATE products SET created_at = '2026-01-01 12:00:00'"
+        ))
+
+    assert _walk_pages(client, "desc") == sorted(ids, reverse=True)
+    assert _walk_pages(client, "asc") == sorted(ids)